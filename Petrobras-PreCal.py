@@ -1,8 +1,17 @@
 import streamlit as st
-import math
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import datetime
+from functools import lru_cache
+
+# plotly is deliberately NOT imported here: Streamlit re-runs this script on
+# every widget interaction, and plotly.express alone costs hundreds of
+# milliseconds to import. It is imported lazily in the branches that
+# actually need it.
+
+# The footer copyright year, resolved up front rather than via a fresh
+# datetime.now() call buried in the footer.
+CURRENT_YEAR = datetime.datetime.now().year
 
 # --- Configuration ---
 
@@ -31,6 +40,7 @@ DEFAULT_EXPORT_VOLUMES = {
 
 # --- Helper Function for Year/Route Dependent Fixed Vessels ---
 
+@lru_cache(maxsize=None)
 def get_fixed_vessels(route_key, year):
     """Determines the number of new builds and existing vessels based on route and year."""
     new_builds = 0
@@ -54,6 +64,114 @@ def get_fixed_vessels(route_key, year):
         if year == 2030: new_builds = 0; existing = 4
     return new_builds, existing
 
+# Flat (route, year) -> (divisor_hundredths, display_name, new_builds,
+# existing) lookup, built once at import so the calculation loop does a single
+# dict access instead of re-running the if/elif cascade per route. Divisors
+# are stored as integer hundredths so the ceiling division below stays in
+# exact integer arithmetic, immune to float rounding at the ceil boundary.
+FIXED_TABLE = {
+    (key, year): (int(round(ROUTE_INFO[key]["divisor"] * 100)), ROUTE_INFO[key]["display_name"], *get_fixed_vessels(key, year))
+    for key in ROUTE_KEYS_ORDERED for year in YEAR_OPTIONS
+}
+
+# --- Cached Figure Builder ---
+
+@lru_cache(maxsize=None)
+def register_plotly_template():
+    """Registers the app's Plotly template once per process and makes it the
+    default, so figures pick up the shared layout at construction instead of
+    re-validating the same update_layout kwargs every time."""
+    import plotly.io as pio
+    import plotly.express as px
+    import plotly.graph_objects as go
+    pio.templates["vesselapp"] = go.layout.Template(layout=dict(
+        colorway=px.colors.qualitative.Pastel1,
+        xaxis=dict(title=None), yaxis=dict(title="Number of Vessels", gridcolor='lightgrey'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        uniformtext_minsize=8, uniformtext_mode='hide',
+        margin=dict(l=10, r=10, t=20, b=10), height=350
+    ))
+    pio.templates.default = "vesselapp"
+
+def route_bar_trace(name, vessel_counts):
+    """Returns the bar-trace dict for one route, reusing the previous trace
+    from session state when its counts are unchanged — so editing a single
+    volume only rebuilds that route's trace, not all six."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    cache = st.session_state.setdefault('route_trace_cache', {})
+    cached = cache.get(name)
+    if cached is not None and cached[0] == vessel_counts:
+        return cached[1]
+    category_order = ["Total Vessels Required", "Existing Vessels", "New Building Needed", "Charter Vessels Needed"]
+    # Direct go.Bar skips the Plotly Express DataFrame pipeline entirely.
+    # Plotly has no WebGL bar trace (scattergl only covers scatter/line), so
+    # graph_objects construction is as close to the GL path as bars get.
+    # Single color to match the original px.bar output, which had no color=
+    # mapping and drew every bar in Pastel1[0].
+    trace = go.Bar(
+        x=category_order, y=list(vessel_counts), text=list(vessel_counts),
+        texttemplate='%{text:.0f}', textposition='outside',
+        marker_color=px.colors.qualitative.Pastel1[0], showlegend=False
+    ).to_plotly_json()
+    cache[name] = (vessel_counts, trace)
+    return trace
+
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def build_routes_figure(route_entries):
+    """Builds one faceted figure covering every route, so the browser boots a
+    single plotly.js instance instead of one per chart. Cached on the vessel
+    counts so reruns with unchanged results skip figure construction.
+
+    Returns the figure as a plain dict (fig.to_dict()) so the cache stores
+    pre-serialized output; callers rewrap it in go.Figure, which is cheap
+    compared with rebuilding and revalidating the figure.
+
+    route_entries: tuple of (display_name, export_volume,
+    (total, existing, new_builds, charter)) in display order.
+    """
+    from plotly.subplots import make_subplots
+    register_plotly_template()
+    n_cols = 3
+    n_rows = -(-len(route_entries) // n_cols)
+    fig = make_subplots(
+        rows=n_rows, cols=n_cols,
+        subplot_titles=[f"{name}<br><sup>Volume: {volume:.2f} MM bbl/year</sup>"
+                        for name, volume, _ in route_entries]
+    )
+    for i, (name, _, vessel_counts) in enumerate(route_entries):
+        fig.add_trace(route_bar_trace(name, vessel_counts),
+                      row=i // n_cols + 1, col=i % n_cols + 1)
+    fig.update_layout(height=400 * n_rows)
+    return fig.to_dict()
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def compute_all_routes(year, volumes):
+    """Computes vessel requirements for every route. Cached on the (year,
+    volumes) pair so repeat submissions of the same inputs return instantly.
+
+    volumes: tuple of export volumes in ROUTE_KEYS_ORDERED order.
+    """
+    # Integer ceiling division on hundredths: exact and bit-stable across
+    # platforms, unlike np.ceil on the float quotient.
+    volume_hundredths = np.rint(np.asarray(volumes) * 100).astype(np.int64)
+    divisors = np.array([FIXED_TABLE[(k, year)][0] for k in ROUTE_KEYS_ORDERED])
+    new_builds = np.array([FIXED_TABLE[(k, year)][2] for k in ROUTE_KEYS_ORDERED])
+    existing = np.array([FIXED_TABLE[(k, year)][3] for k in ROUTE_KEYS_ORDERED])
+    totals = -(-volume_hundredths // divisors)
+    charters = np.maximum(0, totals - new_builds - existing)
+    return {
+        key: {
+            "route_display_name": FIXED_TABLE[(key, year)][1],
+            "export_volume": volumes[i],
+            "Total Vessels Required": int(totals[i]),
+            "New Building Needed": int(new_builds[i]),
+            "Existing Vessels": int(existing[i]),
+            "Charter Vessels Needed": int(charters[i])
+        }
+        for i, key in enumerate(ROUTE_KEYS_ORDERED)
+    }
+
 # --- Initialize Session State ---
 if 'selected_year' not in st.session_state:
     st.session_state.selected_year = YEAR_OPTIONS[0]
@@ -70,11 +188,6 @@ if 'calculated_results_all_routes' not in st.session_state:
 if 'show_results' not in st.session_state:
     st.session_state.show_results = False
 
-# --- Callback ---
-def clear_results_on_year_change():
-    st.session_state.calculated_results_all_routes = None
-    st.session_state.show_results = False
-
 # --- App Layout ---
 st.set_page_config(layout="wide")
 st.title("ABS EAL: Multi-Route Shipping Vessel Composition Calculator")
@@ -82,54 +195,57 @@ st.markdown("Fleet Composition Decision Making Tool")
 st.divider()
 
 # --- Input Section ---
-st.subheader("1. Select Target Year")
-selected_year = st.selectbox(
-    "Select Target Year:", options=YEAR_OPTIONS, key='year_select',
-    on_change=clear_results_on_year_change
-)
+# The form batches all input edits into a single rerun on submit, so typing
+# in the editor no longer re-executes the script (and re-lays-out the output
+# charts) per keystroke.
+with st.form("inputs"):
+    st.subheader("1. Select Target Year")
+    selected_year = st.selectbox(
+        "Select Target Year:", options=YEAR_OPTIONS, key='year_select'
+    )
+    st.subheader("2. Enter Cargo Export Volumes (MM bbl/year)")
+    # One data_editor over a 1x6 frame replaces six independent number_input
+    # widgets (one WebSocket-synced component instead of six per rerun).
+    vols_df = pd.DataFrame([{key: st.session_state[f"volume_{key}"] for key in ROUTE_KEYS_ORDERED}])
+    edited_vols = st.data_editor(
+        vols_df, num_rows="fixed", hide_index=True, use_container_width=True,
+        column_config={
+            key: st.column_config.NumberColumn(
+                ROUTE_INFO[key]["display_name"], min_value=0.0, step=10.0, format="%.2f",
+                required=True, help=f"Enter volume for {ROUTE_INFO[key]['display_name']}."
+            )
+            for key in ROUTE_KEYS_ORDERED
+        },
+        key="vols_editor"
+    )
+    submitted = st.form_submit_button("Calculate All Routes", type="primary")
 st.session_state.selected_year = selected_year # Update state
-st.subheader("2. Enter Cargo Export Volumes (MM bbl/year)")
-cols = st.columns(3)
-col_idx = 0
 for route_key in ROUTE_KEYS_ORDERED:
-    vol_key = f"volume_{route_key}"
-    route_display_name = ROUTE_INFO[route_key]["display_name"]
-    with cols[col_idx]:
-        # number_input will automatically use the default set in session state via 'key'
-        st.number_input(
-            f"Volume for {route_display_name}:", min_value=0.0, step=10.0,
-            format="%.2f", key=vol_key, help=f"Enter volume for {route_display_name}."
-        )
-    col_idx = (col_idx + 1) % 3
+    st.session_state[f"volume_{route_key}"] = float(edited_vols.iloc[0][route_key])
+
+# Invalidate stale results only when the effective inputs actually changed,
+# instead of clearing them from per-widget on_change callbacks.
+inputs_key = (selected_year, tuple(round(st.session_state[f"volume_{k}"], 6) for k in ROUTE_KEYS_ORDERED))
+if st.session_state.get('last_inputs_key') != inputs_key:
+    st.session_state.calculated_results_all_routes = None
+    st.session_state.show_results = False
+    st.session_state.last_inputs_key = inputs_key
 st.divider()
 
 # --- Calculation Trigger ---
-if st.button("Calculate All Routes", type="primary"):
+if submitted:
     all_volumes_valid = True
     for key in ROUTE_INFO.keys():
-        if st.session_state[f"volume_{key}"] <= 0:
+        # "not > 0" instead of "<= 0" so a NaN from a cleared editor cell
+        # also fails validation rather than slipping into the calculation.
+        if not (st.session_state[f"volume_{key}"] > 0):
             st.warning(f"Enter positive volume for {ROUTE_INFO[key]['display_name']}.")
             all_volumes_valid = False; break
     if all_volumes_valid:
-        results_dict = {}
         current_year = st.session_state.selected_year
+        volumes = tuple(st.session_state[f"volume_{k}"] for k in ROUTE_KEYS_ORDERED)
         with st.spinner("Calculating..."):
-            for key, info in ROUTE_INFO.items():
-                volume = st.session_state[f"volume_{key}"]
-                divisor = info["divisor"]
-                new_builds, existing = get_fixed_vessels(key, current_year)
-                total_vessels = math.ceil(volume / divisor)
-                new_builds_needed = new_builds
-                existing_vessels = existing
-                charter_needed = max(0, total_vessels - new_builds_needed - existing_vessels)
-                results_dict[key] = {
-                    "route_display_name": info["display_name"],
-                    "export_volume": volume,
-                    "Total Vessels Required": total_vessels,
-                    "New Building Needed": new_builds_needed,
-                    "Existing Vessels": existing_vessels,
-                    "Charter Vessels Needed": charter_needed
-                }
+            results_dict = compute_all_routes(current_year, volumes)
         st.session_state.calculated_results_all_routes = results_dict
         st.session_state.show_results = True
         st.success("Calculations complete for all routes.")
@@ -142,40 +258,20 @@ st.divider()
 st.subheader("3. Calculated Results per Route")
 if st.session_state.show_results and st.session_state.calculated_results_all_routes:
     all_results = st.session_state.calculated_results_all_routes
-    out_cols = st.columns(3)
-    out_col_idx = 0
-    for route_key in ROUTE_KEYS_ORDERED:
-        route_result = all_results.get(route_key)
-        if route_result:
-            with out_cols[out_col_idx]:
-                st.markdown(f"**{route_result['route_display_name']}**")
-                st.caption(f"Volume: {route_result['export_volume']:.2f} MM bbl/year")
-                vessel_types = ["Total Vessels Required", "Existing Vessels", "New Building Needed", "Charter Vessels Needed"]
-                vessel_counts = [route_result["Total Vessels Required"], route_result["Existing Vessels"], route_result["New Building Needed"], route_result["Charter Vessels Needed"]]
-                chart_data = pd.DataFrame({"Category": vessel_types, "Number": vessel_counts})
-                category_order = ["Total Vessels Required", "Existing Vessels", "New Building Needed", "Charter Vessels Needed"]
-                chart_data['Category'] = pd.Categorical(chart_data['Category'], categories=category_order, ordered=True)
-                chart_data = chart_data.sort_values('Category')
-                fig = px.bar(
-                    chart_data, x="Category", y="Number", text="Number",
-                    labels={"Number": "Count"},
-                    color_discrete_sequence=px.colors.qualitative.Pastel1
-                )
-                fig.update_layout(
-                    xaxis_title=None, yaxis_title="Number of Vessels",
-                    plot_bgcolor='rgba(0,0,0,0)', yaxis_gridcolor='lightgrey',
-                    uniformtext_minsize=8, uniformtext_mode='hide',
-                    margin=dict(l=10, r=10, t=20, b=10), height=350
-                )
-                fig.update_traces(texttemplate='%{text:.0f}', textposition='outside')
-                st.plotly_chart(fig, use_container_width=True)
-            out_col_idx = (out_col_idx + 1) % 3
+    route_entries = tuple(
+        (r["route_display_name"], r["export_volume"],
+         (r["Total Vessels Required"], r["Existing Vessels"], r["New Building Needed"], r["Charter Vessels Needed"]))
+        for route_key in ROUTE_KEYS_ORDERED if (r := all_results.get(route_key))
+    )
+    import plotly.graph_objects as go
+    fig = go.Figure(build_routes_figure(route_entries))
+    # theme=None skips Streamlit's theme merge re-walking the figure tree.
+    st.plotly_chart(fig, use_container_width=True, theme=None)
 else:
     if not st.session_state.show_results:
         st.info("Click 'Calculate All Routes' after entering export volumes.")
 
 # --- Footer ---
 st.divider()
-current_year = datetime.datetime.now().year
-st.caption(f"© {current_year} ABS EAL Lead: Dr. Chenxi Ji")
+st.caption(f"© {CURRENT_YEAR} ABS EAL Lead: Dr. Chenxi Ji")
 st.caption("Disclaimer: Calculations based on predefined rules and user inputs.")